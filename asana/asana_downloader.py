@@ -7,10 +7,381 @@ from dotenv import load_dotenv
 import configparser
 import sys
 import uuid
+from contextlib import nullcontext
 import re
+import threading
+import hashlib
+import shutil
+import time
+import random
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+class SyncManifest:
+    """Append-only JSON-lines record of downloaded attachments and completed syncs"""
+
+    def __init__(self, manifest_path):
+        self.manifest_path = Path(manifest_path)
+        self.attachments = {}
+        self.last_sync = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Read existing entries, ignoring a truncated last line from an interrupted run"""
+        if not self.manifest_path.exists():
+            return
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get('type') == 'attachment':
+                    self.attachments[entry['gid']] = entry
+                elif entry.get('type') == 'sync':
+                    self.last_sync = datetime.fromisoformat(entry['started_at'])
+        print(f"Loaded sync manifest: {len(self.attachments)} attachments already downloaded")
+
+    def _append(self, entry):
+        with self._lock:
+            with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+
+    def __contains__(self, gid):
+        return gid in self.attachments
+
+    def record_attachment(self, gid, size, checksum, path):
+        """Remember a successfully downloaded attachment"""
+        entry = {
+            'type': 'attachment',
+            'gid': gid,
+            'size': size,
+            'sha256': checksum,
+            'path': str(path),
+            'downloaded_at': datetime.now().isoformat()
+        }
+        with self._lock:
+            self.attachments[gid] = entry
+        self._append(entry)
+
+    def record_sync(self, started_at):
+        """Mark a sync that started at started_at as completed successfully"""
+        self.last_sync = started_at
+        self._append({
+            'type': 'sync',
+            'started_at': started_at.isoformat(),
+            'completed_at': datetime.now().isoformat()
+        })
+
+class RunCheckpoint:
+    """JSON-lines record of the projects and tasks an unfinished run has fully downloaded
+
+    A task is complete once every one of its attachments downloaded successfully,
+    and a project once all of its tasks with attachments are complete. The file is
+    removed once a run has gone through every project, even if some downloads
+    failed: only the interrupted run is resumed from it, and failed files are
+    retried by later runs through the manifest and the unadvanced sync window.
+    """
+
+    def __init__(self, checkpoint_path):
+        self.checkpoint_path = Path(checkpoint_path)
+        self.started_at = None
+        self.modified_since = None
+        self.completed_projects = set()
+        self.completed_tasks = set()
+        self._remaining = {}        # task gid -> [attachments left, all succeeded so far]
+        self._project_tasks = {}    # project gid -> gids of its unfinished tasks
+        self._task_projects = {}    # task gid -> project gid
+        self._listed_projects = set()  # projects whose task listing has been fully queued
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.checkpoint_path.exists():
+            return
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get('type') == 'run':
+                    self.started_at = datetime.fromisoformat(entry['started_at'])
+                    self.modified_since = datetime.fromisoformat(entry['modified_since'])
+                elif entry.get('type') == 'project':
+                    self.completed_projects.add(entry['gid'])
+                elif entry.get('type') == 'task':
+                    self.completed_tasks.add(entry['gid'])
+        print(f"Loaded checkpoint: {len(self.completed_projects)} projects and "
+              f"{len(self.completed_tasks)} tasks already finished")
+
+    def _append(self, entry):
+        with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+    def is_resuming(self):
+        return self.started_at is not None
+
+    def start(self, started_at, modified_since):
+        """Record the window of a new run so an interrupted run resumes with the same one"""
+        self.started_at = started_at
+        self.modified_since = modified_since
+        with self._lock:
+            self._append({
+                'type': 'run',
+                'started_at': started_at.isoformat(),
+                'modified_since': modified_since.isoformat()
+            })
+
+    def add_task(self, task_gid, attachment_count, project_gid=None):
+        """Start tracking a task before its attachments are queued"""
+        with self._lock:
+            self._remaining[task_gid] = [attachment_count, True]
+            if project_gid is not None:
+                self._task_projects[task_gid] = project_gid
+                self._project_tasks.setdefault(project_gid, set()).add(task_gid)
+
+    def add_project(self, project_gid):
+        """Mark the end of a project's task listing; completes it if nothing is pending"""
+        with self._lock:
+            self._project_tasks.setdefault(project_gid, set())
+            self._listed_projects.add(project_gid)
+            self._complete_project_if_done(project_gid)
+
+    def attachment_finished(self, task_gid, success):
+        with self._lock:
+            remaining = self._remaining[task_gid]
+            remaining[0] -= 1
+            remaining[1] = remaining[1] and success
+            if remaining[0] > 0:
+                return
+            del self._remaining[task_gid]
+            project_gid = self._task_projects.pop(task_gid, None)
+            if not remaining[1]:
+                return
+            self.completed_tasks.add(task_gid)
+            self._append({'type': 'task', 'gid': task_gid})
+            if project_gid is not None:
+                self._project_tasks[project_gid].discard(task_gid)
+                self._complete_project_if_done(project_gid)
+
+    def _complete_project_if_done(self, project_gid):
+        # Caller holds self._lock. A project completes only after add_project() marked
+        # the end of its listing, so tasks not queued yet cannot be missed. A project
+        # with a failed task never completes, because that task stays in its pending set.
+        if (project_gid in self._listed_projects and project_gid in self._project_tasks
+                and not self._project_tasks[project_gid]):
+            del self._project_tasks[project_gid]
+            self._listed_projects.discard(project_gid)
+            self.completed_projects.add(project_gid)
+            self._append({'type': 'project', 'gid': project_gid})
+
+    def clear(self):
+        """Remove the checkpoint after a run that was not interrupted"""
+        self.checkpoint_path.unlink(missing_ok=True)
+
+class BlobStore:
+    """Content-addressed store keeping one copy of each attachment under its SHA-256
+
+    The date/project/task layout is made of hardlinks to the blobs, so identical
+    attachments on several tasks or days take disk space once.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        # checksum -> lock, so only workers storing the same content wait for each other
+        self._checksum_locks = {}
+        self._locks_lock = threading.Lock()
+
+    def blob_path(self, checksum):
+        return self.root / checksum[:2] / checksum
+
+    def add(self, src_path, checksum, link_path):
+        """Move src_path into the store, or drop it if the content is already known,
+        and expose the blob at link_path. Returns True if the blob was new.
+        Safe to call from several threads.
+        """
+        blob_path = self.blob_path(checksum)
+        with self._locks_lock:
+            checksum_lock = self._checksum_locks.setdefault(checksum, threading.Lock())
+        with checksum_lock:
+            if blob_path.exists():
+                os.remove(src_path)
+                is_new = False
+            else:
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(src_path, blob_path)
+                is_new = True
+        
+        # The blob is in place and never changes, so linking or copying needs no lock
+        try:
+            os.link(blob_path, link_path)
+        except OSError as e:
+            # Hardlinks are unsupported on some filesystems; keep a plain copy instead
+            print(f"Could not hardlink {link_path} ({e}), copying instead")
+            shutil.copy2(blob_path, link_path)
+        return is_new
+
+class RunMetrics:
+    """Thread-safe latency histograms, throughput and queue depth for one run
+
+    Snapshots can be written as JSON or in the Prometheus text exposition format.
+    """
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.latencies = {}         # endpoint -> histogram dict, see observe()
+        self.responses = {}         # (endpoint, status) -> count
+        self.bytes_downloaded = 0
+        self.queue_depth = 0        # downloads submitted but not yet picked up by a worker
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, seconds, status=None):
+        """Record the duration of one request (or transfer) against endpoint"""
+        with self._lock:
+            histogram = self.latencies.get(endpoint)
+            if histogram is None:
+                histogram = self.latencies[endpoint] = {
+                    'buckets': [0] * (len(self.LATENCY_BUCKETS) + 1), 'count': 0, 'sum': 0.0, 'max': 0.0
+                }
+            index = len(self.LATENCY_BUCKETS)
+            for i, bound in enumerate(self.LATENCY_BUCKETS):
+                if seconds <= bound:
+                    index = i
+                    break
+            histogram['buckets'][index] += 1
+            histogram['count'] += 1
+            histogram['sum'] += seconds
+            histogram['max'] = max(histogram['max'], seconds)
+            if status is not None:
+                key = (endpoint, str(status))
+                self.responses[key] = self.responses.get(key, 0) + 1
+
+    def add_bytes(self, count):
+        with self._lock:
+            self.bytes_downloaded += count
+
+    def change_queue_depth(self, delta):
+        """Count downloads entering (+1) or leaving (-1) the queue of jobs waiting for a worker"""
+        with self._lock:
+            self.queue_depth += delta
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def snapshot(self):
+        """Return all metrics as a JSON-serializable dict"""
+        with self._lock:
+            elapsed = time.monotonic() - self.started_at
+            endpoints = {}
+            for endpoint, histogram in self.latencies.items():
+                cumulative, buckets = 0, {}
+                for bound, count in zip(self.LATENCY_BUCKETS + ('+Inf',), histogram['buckets']):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                endpoints[endpoint] = {
+                    'count': histogram['count'],
+                    'sum_seconds': round(histogram['sum'], 6),
+                    'avg_seconds': round(histogram['sum'] / histogram['count'], 6),
+                    'max_seconds': round(histogram['max'], 6),
+                    'buckets': buckets,
+                    'responses': {status: count for (name, status), count in self.responses.items()
+                                  if name == endpoint}
+                }
+            return {
+                'generated_at': datetime.now().isoformat(),
+                'elapsed_seconds': round(elapsed, 3),
+                'bytes_downloaded': self.bytes_downloaded,
+                'bytes_per_second': round(self.bytes_downloaded / elapsed, 1) if elapsed else 0.0,
+                'queue_depth': self.queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+                'endpoints': endpoints
+            }
+
+    def to_prometheus(self):
+        """Render the snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            '# HELP asana_request_duration_seconds Request latency per endpoint.',
+            '# TYPE asana_request_duration_seconds histogram'
+        ]
+        for endpoint, data in snapshot['endpoints'].items():
+            for bound, count in data['buckets'].items():
+                lines.append(f'asana_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+            lines.append(f'asana_request_duration_seconds_sum{{endpoint="{endpoint}"}} {data["sum_seconds"]}')
+            lines.append(f'asana_request_duration_seconds_count{{endpoint="{endpoint}"}} {data["count"]}')
+        lines += ['# HELP asana_responses_total HTTP responses per endpoint and status.',
+                  '# TYPE asana_responses_total counter']
+        for endpoint, data in snapshot['endpoints'].items():
+            for status, count in data['responses'].items():
+                lines.append(f'asana_responses_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        lines += [
+            '# TYPE asana_downloaded_bytes_total counter',
+            f'asana_downloaded_bytes_total {snapshot["bytes_downloaded"]}',
+            '# TYPE asana_download_bytes_per_second gauge',
+            f'asana_download_bytes_per_second {snapshot["bytes_per_second"]}',
+            '# TYPE asana_download_queue_depth gauge',
+            f'asana_download_queue_depth {snapshot["queue_depth"]}',
+            '# TYPE asana_download_queue_depth_max gauge',
+            f'asana_download_queue_depth_max {snapshot["max_queue_depth"]}',
+            '# TYPE asana_run_duration_seconds gauge',
+            f'asana_run_duration_seconds {snapshot["elapsed_seconds"]}'
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write a snapshot to path; a .prom suffix selects Prometheus text, anything else JSON"""
+        path = Path(path)
+        if path.suffix == '.prom':
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), indent=2)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate_per_minute` requests with small bursts"""
+
+    def __init__(self, rate_per_minute, burst=10):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, min(burst, rate_per_minute))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait_time)
+
+    def pause(self, seconds):
+        """Hold back every caller for `seconds`, e.g. after a 429 with Retry-After"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+class DownloadCancelled(Exception):
+    """Raised inside a worker when the run is stopped with Ctrl+C"""
 
 class AsanaDownloader:
-    def __init__(self, access_token):
+    CHUNK_SIZE = 1024 * 1024  # Bytes read from the network and written per chunk
+    POOL_SIZE = 32            # Keep-alive connections kept per host
+    REQUEST_TIMEOUT = (10, 60)  # Connect and read timeouts in seconds
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    # Responses to a download_url that has expired (listing URLs last about two minutes)
+    EXPIRED_URL_STATUSES = {401, 403}
+
+    def __init__(self, access_token, requests_per_minute=150, max_retries=5):
         print("Initializing AsanaDownloader...")
         self.access_token = access_token
         self.headers = {
@@ -18,11 +389,41 @@ class AsanaDownloader:
             'Accept': 'application/json'
         }
         self.base_url = 'https://app.asana.com/api/1.0'
+        self.max_retries = max_retries
+        # One pooled session reuses connections across calls and worker threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.POOL_SIZE, pool_maxsize=self.POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.rate_limiter = RateLimiter(requests_per_minute)
+        self.metrics = RunMetrics()
         self.total_projects = 0
         self.tasks_with_attachments = 0
         self.total_files = 0
         self.total_size = 0
+        self.skipped_files = 0
+        self.deduplicated_files = 0
+        self.deduplicated_size = 0
         self.errors = []
+        # Set to a SyncManifest to skip attachments downloaded by earlier runs
+        self.manifest = None
+        # Set to a BlobStore to keep each unique file once and hardlink it into place
+        self.blob_store = None
+        # Set to a RunCheckpoint to skip projects and tasks an interrupted run finished
+        self.checkpoint = None
+        # Optional limits shared with other downloaders (see asset_backup): a semaphore
+        # capping concurrent blob transfers and an object whose consume(n) throttles bytes
+        self.transfer_slots = None
+        self.bandwidth_limiter = None
+        # Set on Ctrl+C so workers stop and keep their partial files
+        self._stop = threading.Event()
+        # Guards statistics when downloading concurrently
+        self._lock = threading.Lock()
+        # directory -> names in use and next numeric suffix per name, see _get_unique_filepath
+        self._name_index = {}
+        self._names_lock = threading.Lock()
+        # Gids of tasks whose attachments were queued by this run, see _iter_task_jobs
+        self._queued_tasks = set()
 
     def _sanitize_filename(self, filename):
         """Remove or replace invalid characters in filename"""
@@ -51,17 +452,74 @@ class AsanaDownloader:
         return filename
 
     def _get_unique_filepath(self, directory, filename):
-        """Ensure filename is unique in directory"""
-        base, ext = os.path.splitext(filename)
-        counter = 1
-        final_path = directory / filename
-        
-        while final_path.exists():
+        """Ensure filename is unique in directory
+
+        Names are allocated from an in-memory index of each directory, listed
+        once on first use, instead of probing the filesystem for every
+        candidate. The returned name is reserved immediately, so concurrent
+        workers never receive the same path.
+        """
+        with self._names_lock:
+            index = self._name_index.get(directory)
+            if index is None:
+                names = set(os.listdir(directory)) if directory.exists() else set()
+                index = self._name_index[directory] = {'names': names, 'counters': {}}
+            
+            names = index['names']
+            if filename not in names:
+                names.add(filename)
+                return directory / filename
+            
+            # Continue numbering from the last suffix handed out for this name
+            base, ext = os.path.splitext(filename)
+            counter = index['counters'].get(filename, 1)
             new_filename = f"{base}_{counter}{ext}"
-            final_path = directory / new_filename
-            counter += 1
+            while new_filename in names:
+                counter += 1
+                new_filename = f"{base}_{counter}{ext}"
+            index['counters'][filename] = counter + 1
+            names.add(new_filename)
+            return directory / new_filename
+
+    def _request(self, endpoint, url, rate_limited=True, **kwargs):
+        """GET url through the shared session, retrying throttled and failed requests
+
+        429 and 5xx responses and connection errors are retried up to
+        max_retries times with exponential backoff and jitter. A Retry-After
+        header is honored and pauses every worker, not just this one.
+        Asana API calls count against the rate limiter; blob downloads from
+        download_url do not. The last response is returned as-is, so callers
+        still use raise_for_status(). Every attempt's latency (until the
+        response headers arrive) is recorded in self.metrics under endpoint.
+        """
+        kwargs.setdefault('timeout', self.REQUEST_TIMEOUT)
+        for attempt in range(self.max_retries + 1):
+            if rate_limited:
+                self.rate_limiter.acquire()
+            backoff = min(60, 2 ** attempt) + random.uniform(0, 1)
+            request_started = time.monotonic()
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.metrics.observe(endpoint, time.monotonic() - request_started, type(e).__name__)
+                if attempt == self.max_retries:
+                    raise
+                print(f"Request failed ({e}), retrying in {backoff:.1f}s...")
+                time.sleep(backoff)
+                continue
+            self.metrics.observe(endpoint, time.monotonic() - request_started, response.status_code)
+            
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                return response
             
-        return final_path
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                backoff = int(retry_after)
+            if response.status_code == 429:
+                self.rate_limiter.pause(backoff)
+            print(f"Got HTTP {response.status_code}, retrying in {backoff:.1f}s...")
+            response.close()
+            time.sleep(backoff)
 
     def _guess_extension(self, content_type):
         """Guess file extension from content type"""
@@ -89,7 +547,7 @@ class AsanaDownloader:
         print("\nFetching workspace information...")
         url = f'{self.base_url}/workspaces'
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._request('workspaces', url, headers=self.headers)
             response.raise_for_status()
             workspaces = response.json()['data']
             if workspaces:
@@ -111,7 +569,7 @@ class AsanaDownloader:
             projects = []
             while True:
                 print(f"Fetching batch of projects...")
-                response = requests.get(url, headers=self.headers, params=params)
+                response = self._request('projects', url, headers=self.headers, params=params)
                 response.raise_for_status()
                 data = response.json()
                 
@@ -128,24 +586,24 @@ class AsanaDownloader:
             print(f"\nFound {self.total_projects} projects in workspace")
             return projects
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching projects: {e}")
+            self._record_error(f"Error fetching projects: {e}")
             return []
 
     def get_project_tasks(self, project_gid, modified_since):
-        """Fetch tasks from a project modified after specified date"""
+        """Fetch tasks from a project modified after specified date, or None if listing failed"""
         print(f"\nFetching tasks modified since {modified_since.isoformat()}")
         url = f'{self.base_url}/tasks'
         params = {
             'project': project_gid,
             'modified_since': modified_since.isoformat(),
-            'opt_fields': 'name,modified_at,attachments,attachments.name,attachments.download_url',
+            'opt_fields': 'name,modified_at,attachments,attachments.name,attachments.download_url,attachments.size',
             'limit': 100
         }
         
         try:
             tasks = []
             while True:
-                response = requests.get(url, headers=self.headers, params=params)
+                response = self._request('tasks', url, headers=self.headers, params=params)
                 response.raise_for_status()
                 data = response.json()
                 
@@ -160,28 +618,95 @@ class AsanaDownloader:
             tasks_with_attachments = sum(1 for task in tasks if task.get('attachments'))
             if tasks_with_attachments > 0:
                 print(f"Found {tasks_with_attachments} tasks with attachments")
-            self.tasks_with_attachments += tasks_with_attachments
+            with self._lock:
+                self.tasks_with_attachments += tasks_with_attachments
             return tasks
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching tasks: {e}")
-            return []
+            self._record_error(f"Error fetching tasks of project {project_gid}: {e}")
+            return None
+
+    def search_workspace_tasks(self, workspace_gid, modified_since):
+        """Find tasks with attachments modified after the specified date across the whole workspace
+
+        Uses the workspace task search endpoint, which returns at most 100 tasks
+        per call and has no offset pagination. Results are sorted newest-created
+        first and the next page is requested with created_at.before set just
+        after the oldest task seen so far (the bound is exclusive), so tasks
+        sharing its timestamp are not skipped; repeats are dropped by gid.
+        Returns None if search is not available for the workspace (it requires
+        a paid Asana plan).
+        """
+        print(f"\nSearching workspace for tasks with attachments modified since {modified_since.isoformat()}")
+        url = f'{self.base_url}/workspaces/{workspace_gid}/tasks/search'
+        params = {
+            'modified_at.after': modified_since.isoformat(),
+            'has_attachment': 'true',
+            'sort_by': 'created_at',
+            'sort_ascending': 'false',
+            'opt_fields': 'name,created_at,modified_at,projects.name,attachments,attachments.name,attachments.download_url,attachments.size',
+            'limit': 100
+        }
+        
+        try:
+            tasks = []
+            seen = set()
+            while True:
+                response = self._request('search', url, headers=self.headers, params=params)
+                if response.status_code in (402, 403):
+                    print("Workspace search is not available for this workspace")
+                    return None
+                response.raise_for_status()
+                page = response.json()['data']
+                batch = [task for task in page if task['gid'] not in seen]
+                
+                seen.update(task['gid'] for task in batch)
+                tasks.extend(batch)
+                print(f"Found {len(tasks)} tasks so far...")
+                
+                if len(page) < params['limit'] or not page[-1].get('created_at'):
+                    break
+                if not batch:
+                    # A whole page created within one millisecond cannot be paged past
+                    self._record_error(f"Workspace search stuck at tasks created at {page[-1]['created_at']}")
+                    break
+                oldest = datetime.fromisoformat(page[-1]['created_at'].replace('Z', '+00:00'))
+                params['created_at.before'] = (oldest + timedelta(milliseconds=1)).isoformat(timespec='milliseconds')
+            
+            self.tasks_with_attachments += sum(1 for task in tasks if task.get('attachments'))
+            return tasks
+        except requests.exceptions.RequestException as e:
+            print(f"Error searching tasks: {e}")
+            return None
+
+    def get_attachment_details(self, attachment_gid):
+        """Fetch full attachment metadata (name, download_url)"""
+        attachment_url = f'{self.base_url}/attachments/{attachment_gid}'
+        print(f"Fetching attachment details from: {attachment_url}")
+        response = self._request('attachments', attachment_url, headers=self.headers)
+        response.raise_for_status()
+        return response.json()['data']
 
     def download_attachment(self, attachment, base_path, project_name, task_name):
         """Download an attachment and save it to the specified path"""
         try:
             print(f"\nProcessing attachment for task: {task_name}")
             
-            # Get attachment details
-            attachment_url = f'{self.base_url}/attachments/{attachment["gid"]}'
-            print(f"Fetching attachment details from: {attachment_url}")
-            response = requests.get(attachment_url, headers=self.headers)
-            response.raise_for_status()
-            attachment_data = response.json()['data']
+            if self.manifest is not None and attachment['gid'] in self.manifest:
+                print(f"Skipping already downloaded attachment: {attachment.get('name', attachment['gid'])}")
+                with self._lock:
+                    self.skipped_files += 1
+                return True
+            
+            # Get attachment details, reusing the fields expanded in the task listing
+            if attachment.get('download_url'):
+                attachment_data = attachment
+            else:
+                attachment_data = self.get_attachment_details(attachment['gid'])
             
             # Get download URL
             download_url = attachment_data.get('download_url')
             if not download_url:
-                print(f"Warning: No download URL for attachment in task '{task_name}'")
+                self._record_error(f"No download URL for attachment in task '{task_name}'")
                 return False
             
             print(f"Got download URL: {download_url[:100]}...")
@@ -192,61 +717,413 @@ class AsanaDownloader:
             print(f"Creating directory: {file_path}")
             file_path.mkdir(parents=True, exist_ok=True)
             
-            # Download file
-            print("Downloading file content...")
-            file_response = requests.get(download_url)
-            file_response.raise_for_status()
+            # Download file, resuming a partial file left by an earlier run
+            part_path = self._partial_path(base_path, attachment['gid'])
+            with self.transfer_slots or nullcontext():
+                file_response, offset = self._open_download(download_url, part_path)
+                if file_response.status_code in self.EXPIRED_URL_STATUSES and attachment_data is attachment:
+                    # The URL from the task listing has expired; fetch a fresh one and retry once
+                    print("Download URL from the task listing has expired, fetching a fresh one...")
+                    file_response.close()
+                    attachment_data = self.get_attachment_details(attachment['gid'])
+                    download_url = attachment_data.get('download_url')
+                    if not download_url:
+                        self._record_error(f"No download URL for attachment in task '{task_name}'")
+                        return False
+                    file_response, offset = self._open_download(download_url, part_path)
+                with file_response:
+                    file_response.raise_for_status()
+                    
+                    # Get filename from attachment data or generate one
+                    file_name = attachment_data.get('name')
+                    if not file_name:
+                        content_disp = file_response.headers.get('content-disposition')
+                        if content_disp and 'filename=' in content_disp:
+                            file_name = content_disp.split('filename=')[-1].strip('"\'')
+                        else:
+                            ext = self._guess_extension(file_response.headers.get('content-type', ''))
+                            file_name = f"attachment_{uuid.uuid4().hex[:8]}{ext}"
+                        print(f"Generated filename: {file_name}")
+                    
+                    print("Downloading file content...")
+                    size, checksum = self._stream_to_file(file_response, part_path, offset)
             
-            # Update statistics
-            self.total_files += 1
-            self.total_size += len(file_response.content)
-            
-            # Get filename from attachment data or generate one
-            file_name = attachment_data.get('name')
-            if not file_name:
-                content_disp = file_response.headers.get('content-disposition')
-                if content_disp and 'filename=' in content_disp:
-                    file_name = content_disp.split('filename=')[-1].strip('"\'')
-                else:
-                    ext = self._guess_extension(file_response.headers.get('content-type', ''))
-                    file_name = f"attachment_{uuid.uuid4().hex[:8]}{ext}"
-                print(f"Generated filename: {file_name}")
-            
-            # Sanitize filename and ensure it's unique
+            # Move the finished file into place under a unique name; the name is
+            # reserved for this worker, so the move needs no lock
             file_name = self._sanitize_filename(file_name)
             full_path = self._get_unique_filepath(file_path, file_name)
-            print(f"Saving to: {full_path}")
+            if self.blob_store is None:
+                os.replace(part_path, full_path)
+            elif not self.blob_store.add(part_path, checksum, full_path):
+                print(f"Content already stored, linked existing copy: {checksum[:12]}")
+                with self._lock:
+                    self.deduplicated_files += 1
+                    self.deduplicated_size += size
+            print(f"Saved to: {full_path}")
             
-            # Save file
-            with open(full_path, 'wb') as f:
-                f.write(file_response.content)
+            # Update statistics
+            with self._lock:
+                self.total_files += 1
+                self.total_size += size - offset
+            if self.manifest is not None:
+                self.manifest.record_attachment(attachment['gid'], size, checksum, full_path)
             
             print(f"Successfully downloaded: {full_path}")
             return True
+        except DownloadCancelled:
+            print(f"Download cancelled, partial file kept for task '{task_name}'")
+            return False
         except requests.exceptions.RequestException as e:
-            error_msg = f"Error downloading attachment in task '{task_name}': {e}"
-            print(error_msg)
-            self.errors.append(error_msg)
+            self._record_error(f"Error downloading attachment in task '{task_name}': {e}")
             return False
         except Exception as e:
-            error_msg = f"Unexpected error downloading attachment in task '{task_name}': {e}"
-            print(error_msg)
-            self.errors.append(error_msg)
+            self._record_error(f"Unexpected error downloading attachment in task '{task_name}': {e}")
             return False
 
+    def _partial_path(self, base_path, attachment_gid):
+        """Stable location of an attachment's in-progress download, shared by all runs"""
+        partial_dir = Path(base_path) / '.partial'
+        partial_dir.mkdir(parents=True, exist_ok=True)
+        return partial_dir / f"{attachment_gid}.part"
+
+    def _open_download(self, download_url, part_path):
+        """Start a streamed download, continuing part_path with a Range request if it exists
+
+        Returns the response and the byte offset it continues from. Falls back to
+        a full download when the server ignores or rejects the range.
+        """
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        if offset:
+            response = self._request('blob', download_url, rate_limited=False, stream=True,
+                                     headers={'Range': f'bytes={offset}-'})
+            content_range = response.headers.get('Content-Range', '')
+            if response.status_code == 206 and content_range.startswith(f'bytes {offset}-'):
+                print(f"Resuming partial download at {offset} bytes")
+                return response, offset
+            if response.status_code == 200:
+                return response, 0
+            response.close()
+        return self._request('blob', download_url, rate_limited=False, stream=True), 0
+
+    def _stream_to_file(self, response, part_path, offset=0):
+        """Write a streamed response to part_path in fixed-size chunks
+
+        The first `offset` bytes of part_path are kept and the body is appended
+        after them. Returns the total file size and its SHA-256 hex digest.
+        The transfer time is recorded in self.metrics as 'blob_transfer'.
+        """
+        size = 0
+        digest = hashlib.sha256()
+        if offset:
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    size += len(chunk)
+        
+        transfer_started = time.monotonic()
+        with open(part_path, 'ab' if offset else 'wb') as f:
+            for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                if self._stop.is_set():
+                    raise DownloadCancelled()
+                if chunk:
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                    self.metrics.add_bytes(len(chunk))
+                    if self.bandwidth_limiter is not None:
+                        self.bandwidth_limiter.consume(len(chunk))
+        self.metrics.observe('blob_transfer', time.monotonic() - transfer_started)
+        return size, digest.hexdigest()
+
+    def _record_error(self, error_msg):
+        """Print an error and add it to the run statistics"""
+        print(error_msg)
+        with self._lock:
+            self.errors.append(error_msg)
+
+    def iter_attachment_jobs(self, projects, modified_since, max_workers=1):
+        """Yield (attachment, project, task) for every attachment to download
+
+        With max_workers > 1, project task listings are fetched by a pool of
+        threads and each project's attachments are yielded as soon as its
+        listing completes, so downloads start while other projects are still
+        being listed. At most ``max_workers * 2`` listings are in flight or
+        waiting to be consumed.
+        """
+        remaining = []
+        for project in projects:
+            if self.checkpoint is not None and project['gid'] in self.checkpoint.completed_projects:
+                print(f"\nSkipping project finished by the interrupted run: {project['name']}")
+                continue
+            remaining.append(project)
+        
+        if max_workers <= 1:
+            for project in remaining:
+                print(f"\nProcessing project: {project['name']}")
+                
+                # Get tasks for project
+                tasks = self.get_project_tasks(project['gid'], modified_since)
+                
+                yield from self._iter_project_jobs(project, tasks)
+            return
+        
+        max_pending = max_workers * 2
+        pending = {}
+        projects_iter = iter(remaining)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                for project in projects_iter:
+                    if self._stop.is_set():
+                        break
+                    print(f"\nListing tasks of project: {project['name']}")
+                    pending[executor.submit(self.get_project_tasks, project['gid'], modified_since)] = project
+                    if len(pending) >= max_pending:
+                        break
+                if not pending:
+                    break
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    project = pending.pop(future)
+                    print(f"\nProcessing project: {project['name']}")
+                    yield from self._iter_project_jobs(project, future.result())
+
+    def _iter_project_jobs(self, project, tasks):
+        if tasks is None:
+            # Listing failed; leave the project unfinished so a resumed run lists it again
+            return
+        yield from self._iter_task_jobs(project, tasks)
+        if self.checkpoint is not None:
+            self.checkpoint.add_project(project['gid'])
+
+    def iter_workspace_attachment_jobs(self, tasks):
+        """Yield (attachment, project, task) for tasks found by search_workspace_tasks
+
+        A task that belongs to several projects is filed under its first project.
+        """
+        project_gids = set()
+        for task in tasks:
+            projects = task.get('projects') or [{'gid': None, 'name': 'No Project'}]
+            project = projects[0]
+            project_gids.add(project['gid'])
+            self.total_projects = len(project_gids)
+            
+            yield from self._iter_task_jobs(project, [task], track_project=False)
+
+    def _iter_task_jobs(self, project, tasks, track_project=True):
+        for task in tasks:
+            attachments = task.get('attachments', [])
+            if not attachments:
+                continue
+            # A task in several projects is listed once per project; download it
+            # under the first one, so no attachment is fetched twice at the same time
+            if task['gid'] in self._queued_tasks:
+                print(f"Skipping task already queued under another project: {task['name']}")
+                continue
+            self._queued_tasks.add(task['gid'])
+            if self.checkpoint is not None:
+                if task['gid'] in self.checkpoint.completed_tasks:
+                    continue
+                self.checkpoint.add_task(task['gid'], len(attachments),
+                                         project['gid'] if track_project else None)
+            
+            print(f"Processing task: {task['name']} in {project['name']} ({len(attachments)} attachments)")
+            for attachment in attachments:
+                yield attachment, project, task
+
+    def _download_job(self, attachment, base_path, project, task):
+        success = self.download_attachment(attachment, base_path, project['name'], task['name'])
+        if self.checkpoint is not None:
+            self.checkpoint.attachment_finished(task['gid'], success)
+        return success
+
+    def download_all(self, jobs, base_path, max_workers=1):
+        """Download attachment jobs using a bounded pool of worker threads
+
+        Jobs are pulled lazily, so downloads start while tasks are still being
+        listed and at most ``max_workers * 2`` downloads are queued at once.
+        On Ctrl+C queued downloads are dropped, running ones stop after their
+        current chunk, and KeyboardInterrupt is re-raised.
+        """
+        if max_workers <= 1:
+            for attachment, project, task in jobs:
+                if self._stop.is_set():
+                    break
+                self._download_job(attachment, base_path, project, task)
+            return
+
+        max_pending = max_workers * 2
+        pending = set()
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            for attachment, project, task in jobs:
+                if self._stop.is_set():
+                    break
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self._check_jobs(done)
+                self.metrics.change_queue_depth(1)
+                future = executor.submit(self._queued_download_job, attachment, base_path, project, task)
+                future.add_done_callback(self._dequeue_cancelled)
+                pending.add(future)
+            done, _ = wait(pending)
+            self._check_jobs(done)
+        except KeyboardInterrupt:
+            self.stop()
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+    def _queued_download_job(self, *job):
+        # A worker picked the job up, so it no longer counts as queued
+        self.metrics.change_queue_depth(-1)
+        return self._download_job(*job)
+
+    def _dequeue_cancelled(self, future):
+        # Jobs cancelled on Ctrl+C never reach a worker
+        if future.cancelled():
+            self.metrics.change_queue_depth(-1)
+
+    def _check_jobs(self, futures):
+        """Record any exception a finished download worker raised instead of dropping it"""
+        for future in futures:
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                self._record_error(f"Download worker failed: {error!r}")
+
+    def stop(self):
+        """Stop queuing downloads; running ones stop after their current chunk and keep partial files"""
+        self._stop.set()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def get_download_size(self, attachment):
+        """Size of an attachment in bytes, or None if it cannot be determined
+
+        Uses the size from the task listing, then a one-byte ranged GET on the
+        download URL (pre-signed download URLs usually reject HEAD), then the
+        full attachment metadata. If the listing's URL has expired and the
+        metadata has no size, the fresh URL from the metadata is probed instead.
+        """
+        if attachment.get('size') is not None:
+            return attachment['size']
+        
+        download_url = attachment.get('download_url')
+        if download_url:
+            size = self._probe_download_size(download_url)
+            if size is not None:
+                return size
+        
+        attachment_data = self.get_attachment_details(attachment['gid'])
+        if attachment_data.get('size') is not None:
+            return attachment_data['size']
+        fresh_url = attachment_data.get('download_url')
+        if fresh_url and fresh_url != download_url:
+            return self._probe_download_size(fresh_url)
+        return None
+
+    def _probe_download_size(self, download_url):
+        """Size reported for a one-byte ranged GET on download_url, or None"""
+        with self._request('blob', download_url, rate_limited=False, stream=True,
+                           headers={'Range': 'bytes=0-0'}) as response:
+            content_range = response.headers.get('Content-Range', '')
+            if response.status_code == 206 and '/' in content_range and not content_range.endswith('/*'):
+                return int(content_range.rsplit('/', 1)[1])
+            if response.status_code == 200 and response.headers.get('Content-Length'):
+                return int(response.headers['Content-Length'])
+        return None
+
+    def plan_downloads(self, jobs):
+        """Work out what a run would download, without downloading anything
+
+        Returns a dict with the number of files and bytes to download, files
+        already in the manifest, files of unknown size and a per-project breakdown.
+        """
+        plan = {'files': 0, 'bytes': 0, 'already_downloaded': 0, 'unknown_size': 0, 'projects': {}}
+        for attachment, project, task in jobs:
+            if self.manifest is not None and attachment['gid'] in self.manifest:
+                plan['already_downloaded'] += 1
+                continue
+            
+            try:
+                size = self.get_download_size(attachment)
+            except requests.exceptions.RequestException as e:
+                print(f"Could not get size of attachment in task '{task['name']}': {e}")
+                size = None
+            
+            project_plan = plan['projects'].setdefault(project['name'], {'files': 0, 'bytes': 0})
+            plan['files'] += 1
+            project_plan['files'] += 1
+            if size is None:
+                plan['unknown_size'] += 1
+            else:
+                plan['bytes'] += size
+                project_plan['bytes'] += size
+        return plan
+
     def print_statistics(self):
         """Print download statistics and any errors"""
         print(f"\nDownload Statistics:")
         print(f"Total projects processed: {self.total_projects}")
         print(f"Tasks with attachments: {self.tasks_with_attachments}")
         print(f"Total files downloaded: {self.total_files}")
+        if self.manifest is not None:
+            print(f"Files skipped (already downloaded): {self.skipped_files}")
+        if self.blob_store is not None:
+            print(f"Duplicate files linked to stored copies: {self.deduplicated_files} "
+                  f"({self.deduplicated_size / (1024*1024):.2f} MB saved)")
         print(f"Total size downloaded: {self.total_size / (1024*1024):.2f} MB")
+        snapshot = self.metrics.snapshot()
+        print(f"Elapsed time: {snapshot['elapsed_seconds']:.1f}s "
+              f"({snapshot['bytes_per_second'] / (1024*1024):.2f} MB/s)")
         
         if self.errors:
             print("\nErrors encountered:")
             for error in self.errors:
                 print(f"- {error}")
 
+def estimate_download_seconds(plan, max_workers, bytes_per_second, seconds_per_file=1.0):
+    """Rough duration of a planned run
+
+    bytes_per_second is the speed of a single download; seconds_per_file covers
+    the per-file request overhead. Both are spread over max_workers downloads.
+    """
+    workers = max(1, max_workers)
+    average_size = plan['bytes'] / max(1, plan['files'] - plan['unknown_size'])
+    total_bytes = plan['bytes'] + plan['unknown_size'] * average_size
+    return (total_bytes / bytes_per_second + plan['files'] * seconds_per_file) / workers
+
+def print_plan(plan, max_workers, bytes_per_second):
+    """Print the dry-run summary"""
+    print("\nDownload plan (nothing was downloaded):")
+    for project_name, project_plan in sorted(plan['projects'].items()):
+        print(f"- {project_name}: {project_plan['files']} files, {project_plan['bytes'] / (1024*1024):.2f} MB")
+    print(f"Files to download: {plan['files']}")
+    print(f"Total size: {plan['bytes'] / (1024*1024):.2f} MB")
+    if plan['unknown_size']:
+        print(f"Files of unknown size (not in the total): {plan['unknown_size']}")
+    if plan['already_downloaded']:
+        print(f"Files skipped as already downloaded: {plan['already_downloaded']}")
+    seconds = estimate_download_seconds(plan, max_workers, bytes_per_second)
+    print(f"Estimated download time with {max_workers} concurrent downloads at "
+          f"{bytes_per_second / (1024*1024):.1f} MB/s each: {timedelta(seconds=round(seconds))}")
+
+def measured_download_speed(metrics_path, default=2 * 1024 * 1024):
+    """Per-download speed in bytes/s from an earlier run's metrics file, or the default"""
+    try:
+        with open(metrics_path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        transfer_seconds = snapshot['endpoints']['blob_transfer']['sum_seconds']
+        if snapshot['bytes_downloaded'] and transfer_seconds:
+            return snapshot['bytes_downloaded'] / transfer_seconds
+    except (OSError, ValueError, KeyError):
+        pass
+    return default
+
 def load_config():
     """Load configuration from .env file or config.ini"""
     print("Loading configuration...")
@@ -266,6 +1143,78 @@ def load_config():
         print("No token found in configuration files")
     return token
 
+def sync_workspace(downloader, download_path, days_ago, max_concurrent_downloads=8,
+                   incremental_sync=True, workspace_search=True, content_addressed_store=False,
+                   dry_run=False, max_concurrent_listings=4):
+    """Download every attachment changed in the last days_ago days (or since the last sync)
+
+    Returns False if no workspace was found. KeyboardInterrupt is passed on
+    after the running downloads stop, leaving the checkpoint for a resume.
+    With dry_run, returns the plan from plan_downloads instead of downloading.
+    """
+    # Get workspace GID automatically
+    workspace_gid = downloader.get_workspace_gid()
+    if not workspace_gid:
+        print("Error: Could not find any workspace.")
+        return False
+    
+    # Create base download directory
+    Path(download_path).mkdir(parents=True, exist_ok=True)
+    
+    # Calculate date threshold
+    sync_started_at = datetime.now()
+    modified_since = sync_started_at - timedelta(days=days_ago)
+    if incremental_sync:
+        downloader.manifest = SyncManifest(Path(download_path) / '.sync_manifest.jsonl')
+        if downloader.manifest.last_sync:
+            modified_since = downloader.manifest.last_sync
+            print(f"Incremental sync: last successful sync started at {modified_since}")
+    
+    if content_addressed_store:
+        downloader.blob_store = BlobStore(Path(download_path) / '.blobs')
+    
+    # Resume an interrupted run with its original window, skipping finished projects and tasks
+    downloader.checkpoint = RunCheckpoint(Path(download_path) / '.checkpoint.jsonl')
+    if downloader.checkpoint.is_resuming():
+        sync_started_at = downloader.checkpoint.started_at
+        modified_since = downloader.checkpoint.modified_since
+        print(f"Resuming interrupted run started at {sync_started_at}")
+    elif dry_run:
+        # Planning must not leave a checkpoint behind
+        downloader.checkpoint = None
+    else:
+        downloader.checkpoint.start(sync_started_at, modified_since)
+    print(f"Fetching files modified since: {modified_since}")
+    
+    # Find attachments, preferring workspace search and falling back to listing each project
+    tasks = None
+    if workspace_search:
+        tasks = downloader.search_workspace_tasks(workspace_gid, modified_since)
+    if tasks is not None:
+        jobs = downloader.iter_workspace_attachment_jobs(tasks)
+    else:
+        projects = downloader.get_workspace_projects(workspace_gid)
+        jobs = downloader.iter_attachment_jobs(projects, modified_since, max_concurrent_listings)
+    
+    if dry_run:
+        downloader.checkpoint = None
+        return downloader.plan_downloads(jobs)
+    
+    # Download every attachment
+    downloader.download_all(jobs, download_path, max_concurrent_downloads)
+    
+    # Keep the checkpoint only for an interrupted run, and only move the sync
+    # window forward when nothing was missed
+    if downloader.stopped:
+        print("\nStopped before finishing; the next run will resume where it left off")
+        return True
+    downloader.checkpoint.clear()
+    if downloader.errors:
+        print("\nErrors occurred; the next run will retry the failed files")
+    elif downloader.manifest is not None:
+        downloader.manifest.record_sync(sync_started_at)
+    return True
+
 def main():
     # Load configuration
     token = load_config()
@@ -276,54 +1225,50 @@ def main():
     # Configuration
     DOWNLOAD_PATH = 'asana_files'    # Base directory for downloads
     DAYS_AGO = 30                    # Number of days to look back
+    MAX_CONCURRENT_DOWNLOADS = 8     # Attachments downloaded in parallel (1 = one at a time)
+    MAX_CONCURRENT_LISTINGS = 4      # Projects whose tasks are listed in parallel (1 = one at a time)
+    REQUESTS_PER_MINUTE = 150        # Asana API quota (150 on free plans, 1500 on paid plans)
+    INCREMENTAL_SYNC = True          # Skip files already downloaded and resume from the last sync
+    WORKSPACE_SEARCH = True          # Find changed tasks with one workspace search instead of listing every project
+    CONTENT_ADDRESSED_STORE = False  # Store each unique file once and hardlink it into the date/project/task folders
+    METRICS_FILE = 'run_metrics.json'  # Written to the download path after each run (.prom for Prometheus text)
+    DRY_RUN = False                  # List what would be downloaded, with sizes and an estimated duration
     
     print(f"\nStarting download process...")
     print(f"Download path: {DOWNLOAD_PATH}")
     print(f"Looking back {DAYS_AGO} days")
+    print(f"Concurrent downloads: {MAX_CONCURRENT_DOWNLOADS}")
     
     # Initialize downloader
-    downloader = AsanaDownloader(token)
+    downloader = AsanaDownloader(token, requests_per_minute=REQUESTS_PER_MINUTE)
     
-    # Get workspace GID automatically
-    workspace_gid = downloader.get_workspace_gid()
-    if not workspace_gid:
-        print("Error: Could not find any workspace.")
+    try:
+        result = sync_workspace(
+            downloader, DOWNLOAD_PATH, DAYS_AGO, MAX_CONCURRENT_DOWNLOADS,
+            incremental_sync=INCREMENTAL_SYNC,
+            workspace_search=WORKSPACE_SEARCH,
+            content_addressed_store=CONTENT_ADDRESSED_STORE,
+            dry_run=DRY_RUN,
+            max_concurrent_listings=MAX_CONCURRENT_LISTINGS
+        )
+    except KeyboardInterrupt:
+        print("\nStopped. Run the script again to resume where it left off.")
+        downloader.print_statistics()
+        downloader.metrics.write(Path(DOWNLOAD_PATH) / METRICS_FILE)
+        sys.exit(1)
+    if not result:
         sys.exit(1)
     
-    # Calculate date threshold
-    modified_since = datetime.now() - timedelta(days=DAYS_AGO)
-    print(f"Fetching files modified since: {modified_since}")
-    
-    # Create base download directory
-    Path(DOWNLOAD_PATH).mkdir(exist_ok=True)
-    
-    # Get all projects
-    projects = downloader.get_workspace_projects(workspace_gid)
-    
-    # Process each project
-    for project in projects:
-        print(f"\nProcessing project: {project['name']}")
-        
-        # Get tasks for project
-        tasks = downloader.get_project_tasks(project['gid'], modified_since)
-        
-        # Process each task
-        for task in tasks:
-            attachments = task.get('attachments', [])
-            if attachments:
-                print(f"Processing task: {task['name']} ({len(attachments)} attachments)")
-                
-                # Download each attachment
-                for attachment in attachments:
-                    downloader.download_attachment(
-                        attachment,
-                        DOWNLOAD_PATH,
-                        project['name'],
-                        task['name']
-                    )
+    if DRY_RUN:
+        download_speed = measured_download_speed(Path(DOWNLOAD_PATH) / METRICS_FILE)
+        print_plan(result, MAX_CONCURRENT_DOWNLOADS, download_speed)
+        return
     
     # Print final statistics
     downloader.print_statistics()
+    metrics_path = Path(DOWNLOAD_PATH) / METRICS_FILE
+    downloader.metrics.write(metrics_path)
+    print(f"Run metrics written to: {metrics_path}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
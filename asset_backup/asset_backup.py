@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+# The Asana and InVision clients live in sibling folders as standalone scripts
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / 'asana'))
+sys.path.insert(0, str(REPO_ROOT / 'invision'))
+
+import asana_downloader
+import invision_file_download
+
+class BandwidthLimiter:
+    """Token bucket capping the combined download speed of every source, in bytes per second"""
+
+    def __init__(self, bytes_per_second):
+        self.rate = float(bytes_per_second)
+        self.capacity = self.rate  # Allow bursts of up to one second of traffic
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, count):
+        """Account for `count` bytes, sleeping if the cap has been exceeded"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            # Go into debt so concurrent callers queue up behind each other
+            self.tokens -= count
+            wait_time = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait_time:
+            time.sleep(wait_time)
+
+class SourceError(Exception):
+    """A source could not start, e.g. because it is not configured"""
+
+class AsanaSource:
+    """Asana attachments, downloaded with asana_downloader.sync_workspace"""
+    name = 'asana'
+
+    def __init__(self, args):
+        self.args = args
+        self.downloader = None
+
+    def run(self, scheduler):
+        token = asana_downloader.load_config()
+        if not token:
+            raise SourceError("No Asana token found in .env or config.ini")
+
+        self.downloader = asana_downloader.AsanaDownloader(
+            token, requests_per_minute=self.args.asana_requests_per_minute)
+        scheduler.attach(self.downloader)
+        found_workspace = asana_downloader.sync_workspace(
+            self.downloader, self.args.asana_path, self.args.asana_days, scheduler.max_concurrency,
+            workspace_search=not self.args.no_workspace_search,
+            content_addressed_store=self.args.content_addressed
+        )
+        if not found_workspace:
+            raise SourceError("Could not find any Asana workspace")
+
+        self.downloader.metrics.write(Path(self.args.asana_path) / 'run_metrics.json')
+        return {
+            'files': self.downloader.total_files,
+            'bytes': self.downloader.total_size,
+            'skipped': self.downloader.skipped_files,
+            'failed': len(self.downloader.errors),
+            'errors': self.downloader.errors
+        }
+
+    def stop(self):
+        if self.downloader is not None:
+            self.downloader.stop()
+
+class InVisionSource:
+    """InVision document exports, made with invision_file_download.backup_documents"""
+    name = 'invision'
+
+    def __init__(self, args):
+        self.args = args
+        self.invision = None
+
+    def run(self, scheduler):
+        if not self.args.invision_api_key:
+            raise SourceError("No InVision API key (set INVISION_API_KEY or --invision-api-key)")
+
+        self.invision = invision_file_download.InVisionAPI(self.args.invision_api_key)
+        scheduler.attach(self.invision)
+        summary = invision_file_download.backup_documents(
+            self.invision, self.args.invision_path, self.args.invision_filter, scheduler.max_concurrency)
+        return dict(summary, errors=[f"{f['name'] or f['id']}: {f['error']}" for f in self.invision.failures])
+
+    def stop(self):
+        if self.invision is not None:
+            self.invision.stop()
+
+SOURCES = {source.name: source for source in (AsanaSource, InVisionSource)}
+
+class BackupScheduler:
+    """
+    Runs several sources side by side so their network waits overlap
+    Every source shares one budget of concurrent transfers and one bandwidth cap
+    """
+
+    def __init__(self, max_concurrency, bandwidth_limit=None):
+        self.max_concurrency = max_concurrency
+        self.transfer_slots = threading.BoundedSemaphore(max_concurrency)
+        self.bandwidth_limiter = BandwidthLimiter(bandwidth_limit) if bandwidth_limit else None
+
+    def attach(self, client):
+        """Make a client draw from the shared transfer budget and bandwidth cap"""
+        client.transfer_slots = self.transfer_slots
+        client.bandwidth_limiter = self.bandwidth_limiter
+
+    def run(self, sources):
+        """Run every source in its own thread and return a report entry per source"""
+        results = {source.name: {'status': 'running'} for source in sources}
+        # Set when a source's thread is done; Thread.is_alive() is unreliable after
+        # a join interrupted by Ctrl+C
+        finished = [threading.Event() for _ in sources]
+
+        def run_source(source, done):
+            started = time.monotonic()
+            try:
+                results[source.name] = dict(status='completed', **source.run(self))
+            except SourceError as e:
+                results[source.name] = {'status': 'skipped', 'reason': str(e)}
+            except Exception as e:
+                traceback.print_exc()
+                results[source.name] = {'status': 'failed', 'reason': str(e)}
+            results[source.name]['elapsed_seconds'] = round(time.monotonic() - started, 1)
+            done.set()
+
+        def wait_for_sources():
+            for done in finished:
+                # Wait in short steps so Ctrl+C reaches the main thread
+                while not done.wait(0.5):
+                    pass
+
+        for source, done in zip(sources, finished):
+            threading.Thread(target=run_source, args=(source, done), name=source.name, daemon=True).start()
+        try:
+            wait_for_sources()
+        except KeyboardInterrupt:
+            print("\nStopping all sources...")
+            interrupted = [name for name, result in results.items() if result['status'] == 'running']
+            for source in sources:
+                source.stop()
+            # Let each source wind down so the report shows what it finished
+            try:
+                wait_for_sources()
+            except KeyboardInterrupt:
+                print("Not waiting for the sources to stop")
+            for name in interrupted:
+                if results[name]['status'] in ('running', 'completed'):
+                    results[name]['status'] = 'interrupted'
+        return results
+
+def print_report(report):
+    """Print a one-line summary per source"""
+    print("\nBackup report:")
+    for name, result in report['sources'].items():
+        line = f"- {name}: {result['status']}"
+        if 'files' in result:
+            line += f", {result['files']} files ({result['bytes'] / (1024*1024):.2f} MB)"
+        if 'exported' in result:
+            line += f", {result['exported']} exported, {result['unchanged']} unchanged"
+        if result.get('skipped'):
+            line += f", {result['skipped']} skipped"
+        if result.get('failed'):
+            line += f", {result['failed']} failed"
+        if 'reason' in result:
+            line += f" ({result['reason']})"
+        if 'elapsed_seconds' in result:
+            line += f" in {result['elapsed_seconds']}s"
+        print(line)
+    print(f"Total time: {report['elapsed_seconds']}s")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Back up Asana attachments and InVision documents in one run.")
+    parser.add_argument('--sources', nargs='+', choices=sorted(SOURCES), default=sorted(SOURCES),
+                        help="Sources to back up (default: all)")
+    parser.add_argument('--max-concurrency', type=int, default=12,
+                        help="Downloads in flight at once across all sources (default: 12)")
+    parser.add_argument('--bandwidth-limit', type=float, default=None, metavar='MB_PER_SEC',
+                        help="Combined download speed cap in MB/s (default: unlimited)")
+    parser.add_argument('--report', default='backup_report.json',
+                        help="Where to write the combined run report (default: backup_report.json)")
+
+    asana = parser.add_argument_group('Asana')
+    asana.add_argument('--asana-path', default='asana_files', help="Download folder (default: asana_files)")
+    asana.add_argument('--asana-days', type=int, default=30, help="Days to look back on a first sync (default: 30)")
+    asana.add_argument('--asana-requests-per-minute', type=int, default=150,
+                       help="Asana API quota (default: 150)")
+    asana.add_argument('--no-workspace-search', action='store_true',
+                       help="List every project instead of using the workspace task search")
+    asana.add_argument('--content-addressed', action='store_true',
+                       help="Store each unique file once and hardlink it into place")
+
+    invision = parser.add_argument_group('InVision')
+    invision.add_argument('--invision-path', default='invision_exports',
+                          help="Export folder (default: invision_exports)")
+    invision.add_argument('--invision-filter', choices=['my', 'team', 'all'], default='my',
+                          help="Which documents to export (default: my)")
+    invision.add_argument('--invision-api-key', default=os.getenv('INVISION_API_KEY'),
+                          help="API key (default: INVISION_API_KEY environment variable)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    bandwidth_limit = args.bandwidth_limit * 1024 * 1024 if args.bandwidth_limit else None
+    scheduler = BackupScheduler(args.max_concurrency, bandwidth_limit)
+    sources = [SOURCES[name](args) for name in args.sources]
+
+    print(f"Backing up: {', '.join(args.sources)}")
+    print(f"Concurrent downloads: {args.max_concurrency}")
+    if args.bandwidth_limit:
+        print(f"Bandwidth limit: {args.bandwidth_limit} MB/s")
+
+    started_at = datetime.now()
+    started = time.monotonic()
+    results = scheduler.run(sources)
+    report = {
+        'started_at': started_at.isoformat(),
+        'finished_at': datetime.now().isoformat(),
+        'elapsed_seconds': round(time.monotonic() - started, 1),
+        'max_concurrency': args.max_concurrency,
+        'bandwidth_limit_mb_per_sec': args.bandwidth_limit,
+        'sources': results
+    }
+
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"Report written to: {args.report}")
+
+    if any(result['status'] != 'completed' or result.get('failed') for result in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
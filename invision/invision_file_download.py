@@ -1,91 +1,609 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
+import sys
+import time
+import random
+import threading
+import heapq
+import hashlib
+import struct
+import zipfile
 from datetime import datetime
+from contextlib import closing, nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+class ExportError(Exception):
+    """An export job failed or did not finish in time"""
+
+class BackupIndex:
+    """
+    Local record of each exported document's last-modified time and export hash
+    Used to export only documents that changed since the previous backup
+    """
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self.documents = {}
+        self.skipped = 0
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                self.documents = json.load(f)
+
+    @staticmethod
+    def modified_at(doc):
+        return doc.get('updatedAt') or doc.get('updated_at') or doc.get('modifiedAt')
+
+    def is_changed(self, doc):
+        """True unless the document is unmodified and its last export is still on disk"""
+        entry = self.documents.get(str(doc['id']))
+        if not entry or not self.modified_at(doc):
+            return True
+        return entry['modified_at'] != self.modified_at(doc) or not os.path.exists(entry['path'])
+
+    def iter_changed(self, documents):
+        """Yield only documents that need a new export"""
+        for doc in documents:
+            if self.is_changed(doc):
+                yield doc
+            else:
+                self.skipped += 1
+
+    def record(self, doc, exported_file):
+        """
+        Remember a finished export and return the path to keep
+        If the content is identical to the previous export, the new file is
+        removed and the previous path is returned
+        """
+        digest = hashlib.sha256()
+        with open(exported_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        checksum = digest.hexdigest()
+        
+        previous = self.documents.get(str(doc['id']))
+        if (previous and previous['sha256'] == checksum and previous['path'] != exported_file
+                and os.path.exists(previous['path'])):
+            os.remove(exported_file)
+            exported_file = previous['path']
+        
+        self.documents[str(doc['id'])] = {
+            'name': doc.get('name'),
+            'modified_at': self.modified_at(doc),
+            'sha256': checksum,
+            'path': exported_file,
+            'exported_at': datetime.now().isoformat()
+        }
+        self.save()
+        return exported_file
+
+    def save(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.documents, f, indent=2)
+        os.replace(tmp_path, self.index_path)
 
 class InVisionAPI:
-    def __init__(self, api_key):
+    # Adaptive polling of export jobs that are not ready yet (seconds)
+    POLL_INTERVAL = 2
+    MAX_POLL_INTERVAL = 30
+    EXPORT_TIMEOUT = 30 * 60
+    # Bytes per chunk when streaming export zips to disk
+    CHUNK_SIZE = 1024 * 1024
+    # How long cached user/team info stays valid (seconds)
+    IDENTITY_CACHE_TTL = 24 * 60 * 60
+    # Connection pooling, timeouts and retries shared by every request
+    POOL_SIZE = 16
+    REQUEST_TIMEOUT = (10, 60)  # Connect and read timeouts in seconds
+    MAX_RETRIES = 4
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    # Methods that are safe to repeat after a timeout or 5xx (an export POST is not)
+    IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'}
+
+    def __init__(self, api_key, identity_cache_path='.invision_identity_cache.json'):
         self.api_key = api_key
         self.base_url = "https://api.invisionapp.com/v2"
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
-        # Store user and team info after initialization
-        self.user_info = self._get_user_info()
-        self.team_info = self._get_team_info()
+        # User and team info are only fetched when a 'my' or 'team' filter needs them
+        self.identity_cache_path = identity_cache_path
+        self._identity = None
+        self._team_ids = None
+        # One pooled session reuses TLS connections across calls and export workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.POOL_SIZE, pool_maxsize=self.POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # Optional limits shared with other downloaders (see asset_backup): a semaphore
+        # capping concurrent zip downloads and an object whose consume(n) throttles bytes
+        self.transfer_slots = None
+        self.bandwidth_limiter = None
+        # Documents and projects that could not be exported, see record_failure
+        self.failures = []
+        self._failures_lock = threading.Lock()
+        # Set by stop() so export_documents and running downloads wind down
+        self._stop = threading.Event()
+
+    def _request(self, method, url, **kwargs):
+        """
+        Send a request through the shared session with a timeout and bounded retries
+        Connection errors, timeouts, 429 and 5xx responses are retried up to
+        MAX_RETRIES times with exponential backoff, honoring Retry-After.
+        Other methods (POST) may already have been acted on after a timeout or
+        5xx, so they are only retried on connection errors and 429.
+        The final response is returned; callers use raise_for_status()
+        """
+        kwargs.setdefault('timeout', self.REQUEST_TIMEOUT)
+        if method.upper() in self.IDEMPOTENT_METHODS:
+            retry_errors = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+            retry_statuses = self.RETRY_STATUSES
+        else:
+            retry_errors = (requests.exceptions.ConnectionError,)
+            retry_statuses = {429}
+        for attempt in range(self.MAX_RETRIES + 1):
+            backoff = min(30, 2 ** attempt) + random.uniform(0, 1)
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except retry_errors:
+                if attempt == self.MAX_RETRIES:
+                    raise
+                time.sleep(backoff)
+                continue
+            
+            if response.status_code not in retry_statuses or attempt == self.MAX_RETRIES:
+                return response
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                backoff = int(retry_after)
+            response.close()
+            time.sleep(backoff)
+
+    def stop(self):
+        """Stop requesting and polling exports; running zip downloads are abandoned"""
+        self._stop.set()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def record_failure(self, item, error, kind='document'):
+        """Remember a document or project that failed so the run can carry on"""
+        with self._failures_lock:
+            self.failures.append({
+                'kind': kind,
+                'id': item.get('id'),
+                'name': item.get('name'),
+                'error': str(error),
+                'failed_at': datetime.now().isoformat()
+            })
+
+    def _failed(self, doc, error):
+        self.record_failure(doc, error)
+        return doc, None, error
+
+    @property
+    def user_info(self):
+        return self._get_identity()['user_info']
+
+    @property
+    def team_info(self):
+        return self._get_identity()['team_info']
+
+    @property
+    def team_ids(self):
+        """Set of the user's team IDs, built once for O(1) membership checks"""
+        if self._team_ids is None:
+            self._team_ids = {team.get('id') for team in self.team_info.get('teams', [])}
+        return self._team_ids
+
+    def _get_identity(self):
+        """Load user and team info from the disk cache, fetching them if missing or stale"""
+        if self._identity is None:
+            self._identity = self._load_identity_cache()
+        if self._identity is None:
+            self._identity = {
+                'user_info': self._get_user_info(),
+                'team_info': self._get_team_info()
+            }
+            self._save_identity_cache(self._identity)
+        return self._identity
+
+    def _identity_cache_key(self):
+        # Tie the cache to the API key without storing the key itself
+        return hashlib.sha256(self.api_key.encode('utf-8')).hexdigest()[:16]
+
+    def _load_identity_cache(self):
+        if not self.identity_cache_path or not os.path.exists(self.identity_cache_path):
+            return None
+        try:
+            with open(self.identity_cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cache.get('key') != self._identity_cache_key():
+            return None
+        if time.time() - cache.get('fetched_at', 0) > self.IDENTITY_CACHE_TTL:
+            return None
+        return {'user_info': cache['user_info'], 'team_info': cache['team_info']}
+
+    def _save_identity_cache(self, identity):
+        if not self.identity_cache_path:
+            return
+        cache = dict(identity, key=self._identity_cache_key(), fetched_at=time.time())
+        try:
+            with open(self.identity_cache_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f)
+        except OSError as e:
+            print(f"Could not write identity cache {self.identity_cache_path}: {e}")
 
     def _get_user_info(self):
         """Fetch current user information"""
         endpoint = f"{self.base_url}/user"
-        response = requests.get(endpoint, headers=self.headers)
+        response = self._request('GET', endpoint, headers=self.headers)
+        response.raise_for_status()
         return response.json()
 
     def _get_team_info(self):
         """Fetch user's team information"""
         endpoint = f"{self.base_url}/teams"
-        response = requests.get(endpoint, headers=self.headers)
+        response = self._request('GET', endpoint, headers=self.headers)
+        response.raise_for_status()
         return response.json()
 
-    def get_projects(self, filter_type='all'):
+    def _iter_pages(self, endpoint, key, params=None):
         """
-        Fetch projects with filtering options
-        filter_type: 'all', 'my', 'team'
+        Yield items under `key` from every page of a listing endpoint
+        Follows the next-page cursor until the API stops returning one
         """
-        endpoint = f"{self.base_url}/projects"
-        response = requests.get(endpoint, headers=self.headers)
-        projects = response.json().get('projects', [])
+        params = dict(params or {})
+        while True:
+            response = self._request('GET', endpoint, headers=self.headers, params=params)
+            response.raise_for_status()
+            data = response.json()
+            yield from data.get(key, [])
+            
+            cursor = data.get('nextCursor') or data.get('next_cursor') or data.get('pagination', {}).get('nextCursor')
+            if not cursor:
+                break
+            params['cursor'] = cursor
 
+    def _filter_params(self, filter_type):
+        """Owner/team query parameters so the server can filter before paginating"""
+        if filter_type == 'my':
+            return {'ownerId': self.user_info.get('id')}
+        if filter_type == 'team':
+            teams = self.team_info.get('teams', [])
+            if len(teams) == 1:
+                return {'teamId': teams[0].get('id')}
+        return {}
+
+    def _filter_items(self, items, filter_type):
+        """
+        Apply filter_type to items as they arrive
+        Also applied when the server filtered already, in case it ignored the parameters
+        """
         if filter_type == 'all':
-            return projects
+            yield from items
         elif filter_type == 'my':
-            return [p for p in projects if p.get('owner', {}).get('id') == self.user_info.get('id')]
+            user_id = self.user_info.get('id')
+            yield from (i for i in items if i.get('owner', {}).get('id') == user_id)
         elif filter_type == 'team':
-            team_ids = [team.get('id') for team in self.team_info.get('teams', [])]
-            return [p for p in projects if p.get('team', {}).get('id') in team_ids]
-        
-        return []
+            team_ids = self.team_ids
+            yield from (i for i in items if i.get('team', {}).get('id') in team_ids)
+
+    def iter_projects(self, filter_type='all'):
+        """
+        Lazily yield projects page by page with filtering options
+        filter_type: 'all', 'my', 'team'
+        """
+        endpoint = f"{self.base_url}/projects"
+        pages = self._iter_pages(endpoint, 'projects', self._filter_params(filter_type))
+        return self._filter_items(pages, filter_type)
+
+    def iter_documents(self, project_id, filter_type='all'):
+        """
+        Lazily yield a project's documents page by page with filtering options
+        filter_type: 'all', 'my', 'team'
+        """
+        endpoint = f"{self.base_url}/projects/{project_id}/documents"
+        pages = self._iter_pages(endpoint, 'documents', self._filter_params(filter_type))
+        return self._filter_items(pages, filter_type)
+
+    def get_projects(self, filter_type='all'):
+        """
+        Fetch projects with filtering options
+        filter_type: 'all', 'my', 'team'
+        """
+        return list(self.iter_projects(filter_type))
 
     def get_documents(self, project_id, filter_type='all'):
         """
         Fetch documents with filtering options
         filter_type: 'all', 'my', 'team'
         """
-        endpoint = f"{self.base_url}/projects/{project_id}/documents"
-        response = requests.get(endpoint, headers=self.headers)
-        documents = response.json().get('documents', [])
+        return list(self.iter_documents(project_id, filter_type))
 
-        if filter_type == 'all':
-            return documents
-        elif filter_type == 'my':
-            return [d for d in documents if d.get('owner', {}).get('id') == self.user_info.get('id')]
-        elif filter_type == 'team':
-            team_ids = [team.get('id') for team in self.team_info.get('teams', [])]
-            return [d for d in documents if d.get('team', {}).get('id') in team_ids]
+    def request_export(self, document_id):
+        """Start an export job for a document and return its export data"""
+        endpoint = f"{self.base_url}/documents/{document_id}/exports"
+        export_response = self._request('POST', endpoint, headers=self.headers)
+        export_response.raise_for_status()
+        return export_response.json()
+
+    def get_export_status(self, export_data):
+        """Fetch the current state of an export job; merge it into export_data to keep polling"""
+        endpoint = export_data.get('statusUrl') or f"{self.base_url}/exports/{export_data['id']}"
+        response = self._request('GET', endpoint, headers=self.headers)
+        response.raise_for_status()
+        return response.json()
+
+    def _export_state(self, export_data):
+        """Return 'ready', 'failed' or 'pending' for an export job"""
+        if export_data.get('url'):
+            return 'ready'
+        if export_data.get('status') in ('failed', 'error') or not (export_data.get('id') or export_data.get('statusUrl')):
+            return 'failed'
+        return 'pending'
+
+    def download_export(self, document_id, url, export_path):
+        """
+        Download a finished export zip
+        The zip is streamed in chunks to a .part file and only renamed to its
+        final name once its size and central directory check out
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"invision_export_{document_id}_{timestamp}.zip"
+        full_path = os.path.join(export_path, filename)
+        part_path = full_path + '.part'
         
-        return []
+        try:
+            with self.transfer_slots or nullcontext(), \
+                    self._request('GET', url, stream=True) as download_response:
+                download_response.raise_for_status()
+                expected_size = download_response.headers.get('Content-Length')
+                
+                # The end of central directory record sits in the last 64 KiB + 22 bytes
+                size = 0
+                tail = b''
+                with open(part_path, 'wb') as f:
+                    for chunk in download_response.iter_content(chunk_size=self.CHUNK_SIZE):
+                        if self._stop.is_set():
+                            raise ExportError("download stopped")
+                        if chunk:
+                            f.write(chunk)
+                            size += len(chunk)
+                            tail = (tail + chunk)[-(65536 + 22):]
+                            if self.bandwidth_limiter is not None:
+                                self.bandwidth_limiter.consume(len(chunk))
+            
+            if expected_size is not None and size != int(expected_size):
+                raise ExportError(f"incomplete download: got {size} of {expected_size} bytes")
+            self._verify_zip(part_path, size, tail)
+            os.replace(part_path, full_path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        
+        return full_path
 
-    def export_document(self, document_id, export_path):
-        """Export a specific document"""
-        endpoint = f"{self.base_url}/documents/{document_id}/exports"
+    def _verify_zip(self, path, size, tail):
+        """
+        Check that a downloaded zip is complete
+        `tail` holds the last bytes of the file, kept while streaming, so the
+        end of central directory record is found without re-reading the file
+        """
+        eocd_index = tail.rfind(b'PK\x05\x06')
+        if eocd_index < 0 or len(tail) - eocd_index < 22:
+            raise ExportError("not a complete zip: end of central directory record missing")
+        
+        (_, _, _, _, total_entries, cd_size, cd_offset, comment_length) = struct.unpack(
+            '<4s4H2LH', tail[eocd_index:eocd_index + 22])
+        eocd_offset = size - len(tail) + eocd_index
+        if eocd_offset + 22 + comment_length != size:
+            raise ExportError("not a complete zip: trailing data after end of central directory")
+        # 0xFFFFFFFF means the real values live in the zip64 record; zipfile checks those
+        if cd_offset != 0xFFFFFFFF and cd_offset + cd_size > eocd_offset:
+            raise ExportError("not a complete zip: central directory is truncated")
         
-        # Request export
-        export_response = requests.post(endpoint, headers=self.headers)
-        export_data = export_response.json()
+        # Opening the archive parses the central directory (not the member data)
+        try:
+            with zipfile.ZipFile(path) as archive:
+                entries = len(archive.infolist())
+        except zipfile.BadZipFile as e:
+            raise ExportError(f"not a valid zip: {e}")
+        if total_entries != 0xFFFF and entries != total_entries:
+            raise ExportError(f"zip lists {entries} of {total_entries} entries")
+
+    def export_document(self, document_id, export_path):
+        """Export a specific document, waiting for the export to be ready"""
+        export_data = self.request_export(document_id)
         
         # Wait for export to be ready and download
-        if export_data.get('url'):
-            download_response = requests.get(export_data['url'])
-            
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"invision_export_{document_id}_{timestamp}.zip"
-            full_path = os.path.join(export_path, filename)
+        interval = self.POLL_INTERVAL
+        deadline = time.monotonic() + self.EXPORT_TIMEOUT
+        while self._export_state(export_data) == 'pending' and time.monotonic() < deadline:
+            time.sleep(interval)
+            interval = min(interval * 2, self.MAX_POLL_INTERVAL)
+            export_data = {**export_data, **self.get_export_status(export_data)}
+        
+        if self._export_state(export_data) == 'ready':
+            return self.download_export(document_id, export_data['url'], export_path)
+        return None
+
+    def export_documents(self, documents, export_path, max_workers=4):
+        """
+        Export many documents at once
+        Every export job is requested up front on one worker pool. Jobs that
+        are not ready are polled from one shared loop, each with its own
+        backoff, and each zip is downloaded on a second pool as soon as its
+        export is ready, so it never waits behind the remaining requests.
+        After stop() or Ctrl+C, queued requests and downloads are cancelled
+        and the exports that have not finished are dropped.
+        Yields (document, exported_file, error) as each export finishes
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as request_pool, \
+                ThreadPoolExecutor(max_workers=max_workers) as download_pool:
+            futures = {}
+            # (next poll time, order, document, export data, poll interval, deadline)
+            polls = []
+            order = 0
+            try:
+                for doc in documents:
+                    if self._stop.is_set():
+                        break
+                    futures[request_pool.submit(self.request_export, doc['id'])] = ('request', doc)
+                
+                while (futures or polls) and not self._stop.is_set():
+                    # Wake up at least once a second to notice stop()
+                    timeout = min(max(0, polls[0][0] - time.monotonic()), 1) if polls else 1
+                    if futures:
+                        done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+                    else:
+                        self._stop.wait(timeout)
+                        done = set()
+                
+                    # Exports whose job state is known, from finished requests and due polls
+                    updates = []
+                    for future in done:
+                        kind, doc = futures.pop(future)
+                        try:
+                            result = future.result()
+                        except (requests.exceptions.RequestException, ExportError, OSError) as e:
+                            # OSError covers writing the zip, e.g. a full disk
+                            yield self._failed(doc, e)
+                            continue
+                        if kind == 'download':
+                            yield doc, result, None
+                        else:
+                            deadline = time.monotonic() + self.EXPORT_TIMEOUT
+                            updates.append((doc, result, self.POLL_INTERVAL, deadline))
+                
+                    while polls and polls[0][0] <= time.monotonic():
+                        _, _, doc, export_data, interval, deadline = heapq.heappop(polls)
+                        try:
+                            # Keep the job's id/statusUrl if the status body does not repeat them
+                            export_data = {**export_data, **self.get_export_status(export_data)}
+                        except requests.exceptions.RequestException as e:
+                            yield self._failed(doc, e)
+                            continue
+                        updates.append((doc, export_data, min(interval * 2, self.MAX_POLL_INTERVAL), deadline))
+                
+                    for doc, export_data, interval, deadline in updates:
+                        state = self._export_state(export_data)
+                        if state == 'ready':
+                            future = download_pool.submit(self.download_export, doc['id'], export_data['url'], export_path)
+                            futures[future] = ('download', doc)
+                        elif state == 'failed':
+                            yield self._failed(doc, ExportError(f"export failed: {export_data.get('status', 'no export job returned')}"))
+                        elif time.monotonic() >= deadline:
+                            yield self._failed(doc, ExportError(f"export not ready after {self.EXPORT_TIMEOUT} seconds"))
+                        else:
+                            order += 1
+                            heapq.heappush(polls, (time.monotonic() + interval, order, doc, export_data, interval, deadline))
+            except KeyboardInterrupt:
+                # Ctrl+C while waiting here: stop as if stop() was called and pass it on
+                self.stop()
+                raise
+            finally:
+                # Stopped, or closed early by the caller: cancel what has not started
+                # instead of letting the pools drain every queued request on exit
+                if self._stop.is_set() or futures or polls:
+                    print(f"Stopped with {len(futures) + len(polls)} exports unfinished")
+                    request_pool.shutdown(cancel_futures=True)
+                    download_pool.shutdown(cancel_futures=True)
+
+def backup_documents(invision, export_path, filter_type='my', max_concurrent_exports=8, incremental_backup=True):
+    """
+    Export every filtered document of every filtered project to export_path
+    Returns counts of exported, unchanged, skipped and failed documents
+    """
+    os.makedirs(export_path, exist_ok=True)
+    backup_index = BackupIndex(os.path.join(export_path, 'backup_index.json')) if incremental_backup else None
+    summary = {'exported': 0, 'unchanged': 0, 'skipped': 0, 'failed': 0}
+    
+    def iter_all_documents():
+        """List filtered documents of every filtered project, page by page"""
+        project_count = 0
+        for project in invision.iter_projects(filter_type):
+            project_count += 1
+            print(f"\nProject: {project['name']} (ID: {project['id']})")
             
-            with open(full_path, 'wb') as f:
-                f.write(download_response.content)
+            document_count = 0
+            try:
+                for doc in invision.iter_documents(project['id'], filter_type):
+                    document_count += 1
+                    yield doc
+            except requests.exceptions.RequestException as e:
+                # Skip the rest of this project but keep backing up the others
+                print(f"Error listing documents in project {project['name']}: {e}")
+                invision.record_failure(project, e, kind='project')
+                continue
             
-            return full_path
-        return None
+            if not document_count:
+                print(f"No documents found in project with filter: {filter_type}")
+            else:
+                print(f"Found {document_count} documents")
+        
+        if not project_count:
+            print(f"No projects found with filter: {filter_type}")
+    
+    try:
+        # Exports are requested while projects and documents are still being listed
+        print(f"Exporting {filter_type} documents, {max_concurrent_exports} at a time")
+        
+        documents = iter_all_documents()
+        if backup_index is not None:
+            documents = backup_index.iter_changed(documents)
+        
+        exports = invision.export_documents(documents, export_path, max_concurrent_exports)
+        # Closing the generator on the way out cancels exports that have not started
+        with closing(exports):
+            try:
+                for doc, exported_file, error in exports:
+                    if exported_file and backup_index is not None:
+                        kept_file = backup_index.record(doc, exported_file)
+                        if kept_file != exported_file:
+                            print(f"No content changes in {doc['name']}, keeping: {kept_file}")
+                            summary['unchanged'] += 1
+                        else:
+                            print(f"Successfully exported {doc['name']} to: {exported_file}")
+                            summary['exported'] += 1
+                    elif exported_file:
+                        print(f"Successfully exported {doc['name']} to: {exported_file}")
+                        summary['exported'] += 1
+                    elif error:
+                        print(f"Failed to export document: {doc['name']} ({error})")
+                        summary['failed'] += 1
+                    else:
+                        print(f"Failed to export document: {doc['name']}")
+                        summary['failed'] += 1
+            except KeyboardInterrupt:
+                # Abandon running zip downloads too before passing Ctrl+C on
+                invision.stop()
+                raise
+                
+    except requests.exceptions.RequestException as e:
+        print(f"Error occurred: {str(e)}")
+        invision.record_failure({}, e, kind='listing')
+    
+    if backup_index is not None:
+        summary['skipped'] = backup_index.skipped
+        print(f"\nSkipped {backup_index.skipped} unchanged documents")
+    
+    failures_path = os.path.join(export_path, 'failed_exports.json')
+    if invision.failures:
+        with open(failures_path, 'w', encoding='utf-8') as f:
+            json.dump(invision.failures, f, indent=2)
+        print(f"\n{len(invision.failures)} exports failed, see {failures_path}")
+    elif os.path.exists(failures_path):
+        # Failures of an earlier run no longer apply
+        os.remove(failures_path)
+    
+    return summary
 
 def main():
     # Configuration
@@ -93,47 +611,17 @@ def main():
     export_path = "invision_exports"
     # Set filter_type to 'my', 'team', or 'all'
     filter_type = 'my'  # Change this to 'team' to download team files
-    
-    # Create export directory
-    os.makedirs(export_path, exist_ok=True)
+    max_concurrent_exports = 8  # Number of documents exported at the same time
+    incremental_backup = True  # Only export documents changed since the last backup
     
     # Initialize API client
     invision = InVisionAPI(api_key)
     
     try:
-        # Get filtered projects
-        projects = invision.get_projects(filter_type)
-        
-        if not projects:
-            print(f"No projects found with filter: {filter_type}")
-            return
-
-        print(f"Found {len(projects)} {filter_type} projects")
-        
-        for project in projects:
-            print(f"\nProject: {project['name']} (ID: {project['id']})")
-            
-            # Get filtered documents for each project
-            documents = invision.get_documents(project['id'], filter_type)
-            
-            if not documents:
-                print(f"No documents found in project with filter: {filter_type}")
-                continue
-
-            print(f"Found {len(documents)} documents")
-            
-            for doc in documents:
-                print(f"Exporting document: {doc['name']} (ID: {doc['id']})")
-                
-                exported_file = invision.export_document(doc['id'], export_path)
-                
-                if exported_file:
-                    print(f"Successfully exported to: {exported_file}")
-                else:
-                    print(f"Failed to export document: {doc['name']}")
-                
-    except requests.exceptions.RequestException as e:
-        print(f"Error occurred: {str(e)}")
+        backup_documents(invision, export_path, filter_type, max_concurrent_exports, incremental_backup)
+    except KeyboardInterrupt:
+        print("\nStopped. Run the script again to export the remaining documents.")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
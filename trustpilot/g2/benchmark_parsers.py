@@ -0,0 +1,66 @@
+"""
+Side-by-side timing of the parser backends in g2_reviews.py
+Parses a vendor's saved pages (default: the Impact folder) with each backend, and with lxml
+in a pool of processes, and checks they all extract the same rows
+
+Usage:
+    python benchmark_parsers.py [VENDOR]
+"""
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+
+import g2_reviews
+
+PROCESSES = os.cpu_count() or 1
+
+# (label, backend, processes)
+RUNS = [('html.parser', 'html.parser', 1), ('lxml', 'lxml', 1)]
+if PROCESSES > 1:
+    RUNS.append((f'lxml x{PROCESSES}', 'lxml', PROCESSES))
+
+def run_backend(vendor, backend, html_files, processes=1):
+    """Parse every page with one backend, returning (seconds, cards, rows)"""
+    all_rows = []
+    cards = 0
+    started = time.perf_counter()
+    # Hide any per-review error lines
+    with contextlib.redirect_stdout(io.StringIO()):
+        for rows, stats in g2_reviews.parse_pages(html_files, vendor, backend, processes):
+            all_rows.extend(rows)
+            cards += stats['cards']
+    return time.perf_counter() - started, cards, all_rows
+
+def main():
+    vendor = g2_reviews.VENDORS[sys.argv[1] if len(sys.argv) > 1 else 'impact']
+    directory = os.path.join(g2_reviews.G2_DIR, vendor.folder)
+    html_files = sorted(glob.glob(os.path.join(directory, vendor.pattern)))
+    if not html_files:
+        print(f"No {vendor.pattern} pages found in {directory}")
+        sys.exit(1)
+
+    total_mb = sum(os.path.getsize(path) for path in html_files) / (1024*1024)
+    print(f"Parsing {len(html_files)} {vendor.product} pages ({total_mb:.1f} MB) with each backend\n")
+
+    results = {}
+    for label, backend, processes in RUNS:
+        results[label] = run_backend(vendor, backend, html_files, processes)
+        seconds, cards, _ = results[label]
+        print(f"{label:<12} {seconds:6.2f}s  {cards} reviews  {total_mb / seconds:5.1f} MB/s")
+
+    baseline = RUNS[0][0]
+    baseline_seconds, _, baseline_rows = results[baseline]
+    print()
+    for label, _, _ in RUNS[1:]:
+        seconds, _, rows = results[label]
+        print(f"{label} is {baseline_seconds / seconds:.1f}x faster than {baseline}")
+        if rows != baseline_rows:
+            print(f"{label} extracted different rows from {baseline}")
+            sys.exit(1)
+    print("All runs extracted identical rows")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,412 @@
+"""
+Shared extraction for review pages saved from G2
+
+G2 renders every product's reviews with the same markup. Only the product name changes,
+in the reviewer tags (alt="Validated CJ Affiliate Reviewer") and in the question headings
+("What problems is CJ Affiliate solving..."). Each competitor is a Vendor naming that
+product, and one parser handles them all.
+
+Usage:
+    python g2_reviews.py impact
+    python g2_reviews.py awin partnerize --backend html.parser
+    python g2_reviews.py rakuten --product "Rakuten Advertising" --folder "g2 rakuten"
+"""
+import argparse
+import csv
+import glob
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import repeat
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    lxml_html = None
+
+G2_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FIELDNAMES = [
+    'username', 'title', 'industry', 'business_type', 'business_size', 'validated_user',
+    'verified_current_user', 'review_source', 'incentivized_review', 'date',
+    'rating', 'review_title', 'like_best', 'dislike', 'benefits'
+]
+
+class Vendor:
+    """A competitor whose G2 review pages have been saved to a folder"""
+
+    def __init__(self, key, product, folder, output, pattern='*.txt'):
+        self.key = key
+        self.product = product  # Product name exactly as G2 writes it in tags and headings
+        self.folder = folder
+        self.output = output
+        self.pattern = pattern
+
+    @property
+    def validated_alt(self):
+        return f"Validated {self.product} Reviewer"
+
+    @property
+    def screenshot_alt(self):
+        return f"Validated {self.product} Screenshot"
+
+    @property
+    def sections(self):
+        """(field, heading text) for each review question"""
+        return (
+            ('like_best', "What do you like best"),
+            ('dislike', "What do you dislike"),
+            ('benefits', f"What problems is {self.product} solving")
+        )
+
+VENDORS = {vendor.key: vendor for vendor in (
+    Vendor('awin', 'Awin', 'g2 awin', 'g2_reviews_combined.csv'),
+    Vendor('cj', 'CJ Affiliate', 'g2 cj', 'cj_affiliate_reviews.csv', pattern='g2_*_*.txt'),
+    Vendor('impact', 'impact.com/performance', 'g2 impact', 'g2_reviews_impact.csv'),
+    Vendor('partnerize', 'Partnerize', 'g2 partnerize', 'g2_reviews_partnerize.csv'),
+)}
+
+SEGMENT = re.compile(r'Small-Business|Mid-Market|Enterprise')
+
+def categorize_business_size(size_text):
+    if not size_text:
+        return None
+    if "50 or fewer" in size_text or "Small-Business" in size_text:
+        return "Small Business (50 or fewer emp.)"
+    elif "51-1000" in size_text or "Mid-Market" in size_text:
+        return "Mid-Market (51-1000 emp.)"
+    elif "1000" in size_text or "Enterprise" in size_text:
+        return "Enterprise (>1000 emp.)"
+    return None
+
+def clean_answer(text):
+    return text.replace('Review collected by and hosted on G2.com.', '').strip()
+
+class SoupBackend:
+    """Page queries for BeautifulSoup with Python's built-in html.parser, via compiled CSS selectors"""
+    name = 'html.parser'
+
+    SELECTORS = {key: soupsieve.compile(css) for key, css in {
+        'card': 'div[data-track-in-viewport-options]',
+        'user_info': '.inline-block .flex.ai-c',
+        'user_link': 'a.link--header-color',
+        'user_details': '.c-midnight-80.line-height-h6.fw-regular .mt-4th',
+        'tag': '.tag',
+        'date': '.x-current-review-date time',
+        'stars': '.stars',
+        'review_title': '.l2[itemprop="name"]',
+        'answer': 'p.formatted-text',
+    }.items()}
+
+    def cards(self, html_content):
+        return self.all(BeautifulSoup(html_content, 'html.parser'), 'card')
+
+    def first(self, element, selector):
+        return self.SELECTORS[selector].select_one(element)
+
+    def all(self, element, selector):
+        return self.SELECTORS[selector].select(element)
+
+    def has_alt(self, element, alt):
+        return element.find('div', attrs={'alt': alt}) is not None
+
+    def text(self, element):
+        return element.get_text()
+
+    def own_strings(self, element):
+        return element.find_all(string=True, recursive=False)
+
+    def attribute(self, element, name):
+        return element.get(name)
+
+    def classes(self, element):
+        return element.get('class', [])
+
+    def parent_div(self, element):
+        return element.find_parent('div')
+
+    def previous_div(self, element):
+        return element.find_previous_sibling('div')
+
+def has_class(*names):
+    """XPath predicate matching elements that carry every one of the given classes"""
+    return ''.join(f"[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]" for name in names)
+
+class LxmlBackend:
+    """The same page queries for lxml, via compiled XPath; several times faster than SoupBackend"""
+    name = 'lxml'
+
+    if lxml_html is not None:
+        SELECTORS = {key: etree.XPath(xpath) for key, xpath in {
+            'card': "//div[@data-track-in-viewport-options]",
+            'user_info': f".//*{has_class('flex', 'ai-c')}[ancestor::*{has_class('inline-block')}]",
+            'user_link': f".//a{has_class('link--header-color')}",
+            'user_details': f".//*{has_class('mt-4th')}[ancestor::*{has_class('c-midnight-80', 'line-height-h6', 'fw-regular')}]",
+            'tag': f".//*{has_class('tag')}",
+            'date': f".//time[ancestor::*{has_class('x-current-review-date')}]",
+            'stars': f".//*{has_class('stars')}",
+            'review_title': f".//*{has_class('l2')}[@itemprop='name']",
+            'answer': f".//p{has_class('formatted-text')}",
+        }.items()}
+        HAS_ALT = etree.XPath("boolean(.//div[@alt=$alt])")
+
+    def cards(self, html_content):
+        return self.all(lxml_html.document_fromstring(html_content), 'card')
+
+    def first(self, element, selector):
+        matches = self.SELECTORS[selector](element)
+        return matches[0] if matches else None
+
+    def all(self, element, selector):
+        return self.SELECTORS[selector](element)
+
+    def has_alt(self, element, alt):
+        return self.HAS_ALT(element, alt=alt)
+
+    def text(self, element):
+        return element.text_content()
+
+    def own_strings(self, element):
+        strings = [element.text]
+        for child in element:
+            strings.extend([child.text if child.tag is etree.Comment else None, child.tail])
+        return [text for text in strings if text]
+
+    def attribute(self, element, name):
+        return element.get(name)
+
+    def classes(self, element):
+        return (element.get('class') or '').split()
+
+    def parent_div(self, element):
+        return next(element.iterancestors('div'), None)
+
+    def previous_div(self, element):
+        return next(element.itersiblings('div', preceding=True), None)
+
+BACKENDS = {backend.name: backend for backend in (LxmlBackend, SoupBackend)}
+DEFAULT_BACKEND = 'lxml' if lxml_html is not None else 'html.parser'
+
+def index_sections(card, dom):
+    """
+    Map each question heading in a review card to its answer, in one walk over the card
+    An answer is a p.formatted-text whose div follows the div holding the heading
+    """
+    sections = {}
+    for answer in dom.all(card, 'answer'):
+        content_div = dom.parent_div(answer)
+        heading = dom.previous_div(content_div) if content_div is not None else None
+        if heading is not None:
+            sections.setdefault(dom.text(heading).strip(), answer)
+    return sections
+
+def find_section(sections, heading):
+    """The answer under the first indexed heading containing `heading`, if any"""
+    return next((answer for title, answer in sections.items() if heading in title), None)
+
+def extract_review(card, vendor, dom):
+    """Extract one review card into a row of FIELDNAMES"""
+    review_data = {field: None for field in FIELDNAMES}
+
+    # Reviewer name: a profile link, or plain text for anonymous reviewers
+    user_info = dom.first(card, 'user_info')
+    if user_info is not None:
+        name_element = dom.first(user_info, 'user_link')
+        if name_element is not None:
+            review_data['username'] = dom.text(name_element).strip()
+        else:
+            review_data['username'] = next((text.strip() for text in dom.own_strings(user_info) if text.strip()), None)
+
+    # Reviewer details: job title, industry, then market segment and company size, each
+    # on its own line; any of them may be missing and some cards repeat them
+    details = list(dict.fromkeys(dom.text(detail).strip() for detail in dom.all(card, 'user_details')))
+    segments = [detail for detail in details if SEGMENT.search(detail) or 'emp.' in detail]
+    roles = [detail for detail in details if detail and detail not in segments]
+    review_data['title'] = roles[0] if roles else None
+    review_data['industry'] = roles[1] if len(roles) > 1 else None
+    if segments:
+        segment = SEGMENT.search(segments[0])
+        review_data['business_type'] = segment.group(0) if segment else None
+        review_data['business_size'] = categorize_business_size(segments[0])
+
+    # Extract tags
+    review_data['validated_user'] = 'Yes' if dom.has_alt(card, vendor.validated_alt) else 'No'
+    review_data['verified_current_user'] = 'Yes' if dom.has_alt(card, vendor.screenshot_alt) else 'No'
+    tags = [dom.text(tag).strip() for tag in dom.all(card, 'tag')]
+    review_source = next((tag for tag in tags if tag.startswith('Review source:')), None)
+    review_data['review_source'] = review_source.split(':', 1)[1].strip() if review_source else None
+    review_data['incentivized_review'] = 'Yes' if 'Incentivized Review' in tags else 'No'
+
+    # Extract date
+    date_element = dom.first(card, 'date')
+    review_data['date'] = dom.attribute(date_element, 'datetime') if date_element is not None else None
+
+    # Extract rating
+    stars_div = dom.first(card, 'stars')
+    if stars_div is not None:
+        star_classes = [cls for cls in dom.classes(stars_div) if cls.startswith('stars-')]
+        if star_classes:
+            review_data['rating'] = int(star_classes[0].split('-')[-1]) / 2
+
+    # Extract review title and content sections
+    review_title = dom.first(card, 'review_title')
+    review_data['review_title'] = dom.text(review_title).strip().strip('"') if review_title is not None else None
+
+    sections = index_sections(card, dom)
+    for field, heading in vendor.sections:
+        answer = find_section(sections, heading)
+        review_data[field] = clean_answer(dom.text(answer)) if answer is not None else None
+
+    return review_data
+
+def parse_page(html_file_path, vendor, backend=DEFAULT_BACKEND):
+    """Parse one saved page, returning its review rows and counts"""
+    with open(html_file_path, 'r', encoding='utf-8') as file:
+        html_content = file.read()
+
+    if backend == 'lxml' and lxml_html is None:
+        print("lxml is not installed, falling back to html.parser")
+        backend = 'html.parser'
+    dom = BACKENDS[backend]()
+
+    review_cards = dom.cards(html_content)
+    # Counts for this page, so the caller doesn't need to parse the file again
+    stats = {'cards': len(review_cards), 'rows': 0, 'errors': 0}
+    rows = []
+
+    for index, card in enumerate(review_cards, 1):
+        try:
+            rows.append(extract_review(card, vendor, dom))
+            stats['rows'] += 1
+        except Exception as e:
+            stats['errors'] += 1
+            print(f"Error processing review {index} in {html_file_path}: {str(e)}")
+
+    return rows, stats
+
+def parse_pages(html_file_paths, vendor, backend=DEFAULT_BACKEND, max_workers=1):
+    """
+    Parse several pages, yielding (rows, stats) for each in the order given
+    Pages are independent, so with max_workers > 1 they are parsed in a pool of processes
+    """
+    if max_workers > 1 and len(html_file_paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(html_file_paths))) as pool:
+            # map() hands results back in input order however the workers finish
+            yield from pool.map(parse_page, html_file_paths, repeat(vendor), repeat(backend))
+    else:
+        for html_file_path in html_file_paths:
+            yield parse_page(html_file_path, vendor, backend)
+
+def write_reviews_csv(vendor, html_file_paths, csv_file_path, backend=DEFAULT_BACKEND,
+                      max_workers=1, keep_duplicates=False):
+    """Parse the pages in order into one CSV, returning a summary of the run"""
+    summary = {'files': len(html_file_paths), 'cards': 0, 'rows': 0, 'duplicates': 0, 'errors': 0}
+    seen_reviews = set()
+
+    with open(csv_file_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
+        writer.writeheader()
+
+        pages = parse_pages(html_file_paths, vendor, backend, max_workers)
+        for html_file_path, (rows, stats) in zip(html_file_paths, pages):
+            print(f"Reviews found in {os.path.basename(html_file_path)}: {stats['cards']}")
+            summary['cards'] += stats['cards']
+            summary['errors'] += stats['errors']
+
+            for review_data in rows:
+                # Saved pages often overlap, so keep the first copy of each review
+                unique_key = (review_data['username'], review_data['date'], review_data['review_title'])
+                if not keep_duplicates and unique_key in seen_reviews:
+                    summary['duplicates'] += 1
+                    continue
+                seen_reviews.add(unique_key)
+                writer.writerow(review_data)
+                summary['rows'] += 1
+
+    return summary
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Parse review pages saved from G2 into a CSV per competitor.")
+    parser.add_argument('vendors', nargs='+', metavar='VENDOR',
+                        help=f"Competitors to parse: {', '.join(sorted(VENDORS))}, "
+                             "or a new name together with --product and --folder")
+    parser.add_argument('--product', help="Product name as G2 writes it, e.g. \"CJ Affiliate\"")
+    parser.add_argument('--folder', help="Folder of saved pages (default: the vendor's folder next to this script)")
+    parser.add_argument('--files', nargs='+', help="Parse only these files from the folder")
+    parser.add_argument('--pattern', help="Which files in the folder to parse (default: *.txt)")
+    parser.add_argument('--output', help="CSV to write, relative to the folder (default: the vendor's CSV)")
+    parser.add_argument('--dated', action='store_true', help="Add today's date to the CSV name")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                        help=f"HTML parser (default: {DEFAULT_BACKEND})")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Pages parsed at once, one process each (default: one per CPU core)")
+    parser.add_argument('--keep-duplicates', action='store_true',
+                        help="Keep reviews that appear on more than one saved page")
+    args = parser.parse_args(argv)
+
+    per_vendor = [option for option in ('product', 'folder', 'files', 'output') if getattr(args, option)]
+    if per_vendor and len(args.vendors) > 1:
+        parser.error(f"--{per_vendor[0]} can only be used with a single vendor")
+    for key in args.vendors:
+        if key not in VENDORS and not (args.product and args.folder):
+            parser.error(f"Unknown vendor '{key}': give --product and --folder to parse a new one")
+    return args
+
+def resolve_vendor(key, args):
+    """The vendor for `key`, with any command line overrides applied"""
+    known = VENDORS.get(key)
+    return Vendor(
+        key,
+        args.product or known.product,
+        args.folder or known.folder,
+        args.output or (known.output if known else f"g2_reviews_{key}.csv"),
+        args.pattern or (known.pattern if known else '*.txt')
+    )
+
+def main(argv=None):
+    args = parse_args(argv)
+    failed = False
+
+    for key in args.vendors:
+        vendor = resolve_vendor(key, args)
+        folder = os.path.join(G2_DIR, vendor.folder)
+        if args.files:
+            html_file_paths = [os.path.join(folder, filename) for filename in args.files]
+        else:
+            # Name order, so the CSV comes out the same each run
+            html_file_paths = sorted(glob.glob(os.path.join(folder, vendor.pattern)))
+        if not html_file_paths:
+            print(f"No saved pages matching {vendor.pattern} in {folder}")
+            failed = True
+            continue
+
+        csv_file_path = os.path.join(folder, vendor.output)
+        if args.dated:
+            base_name, ext = os.path.splitext(csv_file_path)
+            csv_file_path = f"{base_name}_{datetime.now().strftime('%Y-%m-%d')}{ext}"
+
+        print(f"\n{vendor.product}: parsing {len(html_file_paths)} files with {args.backend}, "
+              f"up to {args.workers} at once")
+        summary = write_reviews_csv(vendor, html_file_paths, csv_file_path, args.backend,
+                                    args.workers, args.keep_duplicates)
+
+        print(f"Total reviews processed: {summary['cards']}")
+        print(f"Rows written: {summary['rows']}")
+        if summary['duplicates']:
+            print(f"Duplicate reviews skipped: {summary['duplicates']}")
+        if summary['errors']:
+            print(f"Reviews that failed to parse: {summary['errors']}")
+            failed = True
+        print(f"CSV file has been created at {csv_file_path}")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()